@@ -3,6 +3,12 @@ import urllib.request
 from typing import Dict, Any
 from ..spatial import SpatialDownloader
 
+# Optional: orjson parses the UTF-8 response bytes directly
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 class EarthExplorerEngine(SpatialDownloader):
     """
     Strategy for USGS Earth Explorer M2M API.
@@ -24,7 +30,11 @@ class EarthExplorerEngine(SpatialDownloader):
         req.add_header('X-Auth-Token', self.api_key)
 
         with urllib.request.urlopen(req) as res:
-            return json.loads(res.read().decode('utf-8'))
+            # orjson parses the UTF-8 bytes directly with no str copy; the stdlib
+            # fallback still decodes internally but skips our explicit decode step
+            if orjson is not None:
+                return orjson.loads(res.read())
+            return json.load(res)
 
     def download(self) -> str:
         """
@@ -1,14 +1,154 @@
-import xml.etree.ElementTree as ET
 import json
 import logging
+from array import array
 import os
 import time
-from typing import Dict, List, Any, Optional
+from typing import BinaryIO, ClassVar, Dict, Iterator, List, Any, Tuple
 
 from ..spatial import SpatialDownloader
 
+# lxml is an optional accelerator: its C-level iterparse is several times faster
+# than the stdlib parser on large OSM extracts. Fall back to xml.etree otherwise.
+try:
+    from lxml import etree as ET  # type: ignore[import-untyped]
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET  # type: ignore[no-redef]
+    HAS_LXML = False
+
+# orjson is likewise optional and only used to serialise the GeoJSON output.
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
+
+def _dumps(obj: Any) -> bytes:
+    """Serialises obj to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class _FeatureCollectionWriter:
+    """
+    Streams GeoJSON features into a FeatureCollection file one at a time,
+    so memory use does not grow with the number of features written.
+    """
+    def __init__(self, output_path: str):
+        self.output_path: str = output_path
+        # Opened by __enter__; write() is only valid inside the with block
+        self._file: BinaryIO
+        self._first: bool = True
+
+    def __enter__(self) -> "_FeatureCollectionWriter":
+        self._file = open(self.output_path, 'wb')
+        self._file.write(b'{"type":"FeatureCollection","features":[')
+        return self
+
+    def write(self, geometry_type: str, coordinates: Any, properties: Dict[str, Any]) -> None:
+        """
+        Appends a single feature to the collection.
+
+        The Feature/geometry envelope is formatted directly into bytes, so only
+        the coordinates and properties go through the JSON encoder and no
+        intermediate feature or geometry dicts are allocated.
+        """
+        if self._first:
+            self._first = False
+            prefix = b'{"type":"Feature","geometry":{"type":"'
+        else:
+            prefix = b',{"type":"Feature","geometry":{"type":"'
+        self._file.write(b''.join((
+            prefix, geometry_type.encode('ascii'),
+            b'","coordinates":', _dumps(coordinates),
+            b'},"properties":', _dumps(properties), b'}',
+        )))
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is not None:
+            # Never leave a well-formed but partial collection behind
+            self._file.close()
+            os.remove(self.output_path)
+            return
+        self._file.write(b']}')
+        self._file.close()
+
+
+# A (lon, lat) position, in GeoJSON axis order
+Coord = Tuple[float, float]
+
+# Top-level OSM elements that own <tag>, <nd> and <member> children
+PRIMARY_TAGS = ("node", "way", "relation")
+
+# Pending lon/lat strings are converted to floats in batches of this size,
+# keeping the raw-string buffer bounded on node-heavy extracts
+NODE_BATCH_SIZE = 65536
+
+# Relation types that are converted into GeoJSON features
+RELATION_TYPES = frozenset(("multipolygon", "boundary", "route", "restriction"))
+
+
+def _iter_primary(input_path: str) -> Iterator[Any]:
+    """
+    Streams fully parsed <node>, <way> and <relation> elements from an OSM file.
+
+    Each element is cleared and detached from the <osm> root once the caller
+    moves on, so memory stays flat regardless of file size. With lxml the tag
+    filter runs in C and no Python-level events are produced for <tag>, <nd>,
+    <member> children or metadata such as <bounds> and <note>.
+    """
+    if HAS_LXML:
+        # huge_tree lifts lxml's safety limits on deep/large documents (OSM dumps)
+        for _, elem in ET.iterparse(input_path, events=("end",), tag=PRIMARY_TAGS, huge_tree=True):
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    else:
+        context = iter(ET.iterparse(input_path, events=("start", "end")))
+        # Grab the <osm> root from the first "start" event
+        _, root = next(context)
+        for event, elem in context:
+            if event == "end" and elem.tag in PRIMARY_TAGS:
+                yield elem
+                elem.clear()
+                root.clear()
+
+
+def _gather_rows(refs: List[str], node_index: Dict[str, int]) -> array:
+    """
+    Resolves way node refs to coordinate-array rows, skipping refs outside the extract.
+
+    The index lookup is driven by map() in C with a single dict probe per ref,
+    instead of an `in` test followed by a second subscript. Rows are packed into
+    an array('q'), 8 bytes per vertex, so ways can be kept for relation assembly
+    without materialising their coordinates.
+    """
+    return array('q', [i for i in map(node_index.get, refs) if i is not None])
+
+
+def _gather_coords(rows: array, node_lon: array, node_lat: array) -> List[Coord]:
+    """
+    Builds (lon, lat) pairs for coordinate-array rows, just before they are written.
+
+    Pairs are tuples, which are smaller than lists and serialise to the same
+    JSON arrays.
+    """
+    return list(zip(map(node_lon.__getitem__, rows), map(node_lat.__getitem__, rows)))
+
+
+def _read_tags(elem: Any) -> Dict[str, str]:
+    """
+    Collects the <tag k=... v=...> children of an OSM element into a dict.
+
+    A fresh dict is built per element, so handlers may take ownership of it and
+    add output properties such as osm_id in place.
+    """
+    return {t.attrib["k"]: t.attrib["v"] for t in elem.iter("tag")}
+
 class OSMEngine(SpatialDownloader):
     """
     OpenStreetMap (OSM) data acquisition and processing engine.
@@ -16,6 +156,9 @@ class OSMEngine(SpatialDownloader):
     Implements the Strategy Pattern to download raw OSM XML via the Overpass API
     and convert it into GeoJSON using an optimized, memory-efficient parser.
     """
+    # The Overpass 'map' endpoint rejects large extents ("Area Too Large"),
+    # but only after spending server time on them; refuse them up front.
+    MAX_AREA_DEG2: ClassVar[float] = 0.25
 
     def download(self) -> str:
         """
@@ -26,6 +169,15 @@ class OSMEngine(SpatialDownloader):
         if not self.bbox:
             raise ValueError("BBOX must be set. Use set_bbox().")
 
+        area_deg2 = (self.bbox['east'] - self.bbox['west']) * (self.bbox['north'] - self.bbox['south'])
+        if area_deg2 > self.MAX_AREA_DEG2 and not self.force_bbox:
+            raise ValueError(
+                f"BBOX covers {area_deg2:.4f} square degrees, above the "
+                f"{self.MAX_AREA_DEG2} limit for the Overpass map endpoint. "
+                "Split it into smaller extents (see download_many()) or "
+                "call set_bbox(..., force=True) to send it anyway."
+            )
+
         # 1. Manually format the bbox string (West,South,East,North)
         # This ensures we get literal commas: "-117.215,32.868,..."
         bbox_str = (
@@ -53,8 +205,9 @@ class OSMEngine(SpatialDownloader):
         Converts OpenStreetMap XML data to GeoJSON format using memory-efficient streaming.
 
         This function parses nodes, ways, and relations (multipolygon, boundary, route, 
-        and restrictions). It uses ET.iterparse to handle large XML files by clearing 
-        elements from memory after processing.
+        and restrictions). It uses ET.iterparse (lxml when installed) to handle large XML files by clearing 
+        elements from memory after processing. Relations are resolved after the parse,
+        once every member they reference is indexed.
 
         Args:
             output_path (str): The file path where the resulting GeoJSON will be saved.
@@ -64,107 +217,141 @@ class OSMEngine(SpatialDownloader):
             None
         """
         start_time = time.time()
-        
-        # Using iterparse for memory efficiency
-        context = ET.iterparse(input_path, events=("start", "end"))
-        
-        nodes: Dict[str, List[float]] = {}
-        ways: Dict[str, Dict[str, Any]] = {}
-        features: List[Dict[str, Any]] = []
-        
-        # Temporary storage for child elements as we stream
-        current_tags: Dict[str, str] = {}
-        current_refs: List[str] = []
-        current_members: List[Dict[str, str]] = []
 
-        for event, elem in context:
-            if event == "start":
-                # Reset temporary storage when a new primary element begins
-                if elem.tag in ["node", "way", "relation"]:
-                    current_tags = {}
-                    current_refs = []
-                    current_members = []
-                continue
-
-            # Processing "end" events to ensure child tags are fully loaded
-            if elem.tag == "tag":
-                current_tags[elem.get("k")] = elem.get("v")
-            
-            elif elem.tag == "nd":
-                current_refs.append(elem.get("ref"))
-                
-            elif elem.tag == "member":
-                current_members.append({
-                    "type": elem.get("type"),
-                    "ref": elem.get("ref"),
-                    "role": elem.get("role")
-                })
-
-            elif elem.tag == "node":
-                n_id = elem.get("id")
-                lon, lat = float(elem.get("lon")), float(elem.get("lat"))
-                nodes[n_id] = [lon, lat]
-                
-                if current_tags:
-                    features.append({
-                        "type": "Feature",
-                        "geometry": {"type": "Point", "coordinates": [lon, lat]},
-                        "properties": {**current_tags, "osm_id": n_id}
-                    })
-                elem.clear() 
-
-            elif elem.tag == "way":
-                w_id = elem.get("id")
-                coords = [nodes[r] for r in current_refs if r in nodes]
-                ways[w_id] = {"coords": coords, "tags": current_tags.copy()}
-                
-                if current_tags:
-                    # GeoJSON Polygon: first and last node must match
-                    is_polygon = coords[0] == coords[-1] if len(coords) > 1 else False
-                    features.append({
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Polygon" if is_polygon else "LineString",
-                            "coordinates": [coords] if is_polygon else coords
-                        },
-                        "properties": {**current_tags, "osm_id": w_id}
-                    })
-                elem.clear()
+        # Features are streamed to disk as they are produced instead of being
+        # collected into one list. The file is opened by the with block below.
+        writer = _FeatureCollectionWriter(output_path)
+        add_feature = writer.write
 
-            elif elem.tag == "relation":
-                r_id = elem.get("id")
-                rel_type = current_tags.get("type")
-
-                if rel_type in ["multipolygon", "boundary"]:
-                    outer = [ways[m["ref"]]["coords"] for m in current_members if m["role"] == "outer" and m["ref"] in ways]
-                    inner = [ways[m["ref"]]["coords"] for m in current_members if m["role"] == "inner" and m["ref"] in ways]
-                    if outer:
-                        features.append({
-                            "type": "Feature",
-                            "geometry": {"type": "MultiPolygon", "coordinates": [outer + inner]},
-                            "properties": {**current_tags, "osm_id": r_id}
-                        })
-                
-                elif rel_type in ["route", "restriction"]:
-                    for m in current_members:
-                        props = {**current_tags, "rel_role": m["role"], "osm_id": r_id}
-                        if m["type"] == "node" and m["ref"] in nodes:
-                            features.append({
-                                "type": "Feature",
-                                "geometry": {"type": "Point", "coordinates": nodes[m["ref"]]},
-                                "properties": props
-                            })
-                        elif m["type"] == "way" and m["ref"] in ways:
-                            features.append({
-                                "type": "Feature",
-                                "geometry": {"type": "LineString", "coordinates": ways[m["ref"]]["coords"]},
-                                "properties": props
-                            })
-                elem.clear()
+        # Node coordinates are kept as parallel C-double arrays (structure of
+        # arrays) addressed through an id -> row index, rather than one Python
+        # list per node. This keeps memory proportional to 16 bytes per node.
+        node_index: Dict[str, int] = {}
+        node_lon = array('d')
+        node_lat = array('d')
+        # Raw lon/lat strings awaiting conversion: float() runs in one C-level
+        # map() per batch instead of two Python-level calls per node
+        pending_lon: List[str] = []
+        pending_lat: List[str] = []
+        # Only way geometry is retained for relation assembly, as node rows
+        # rather than coordinates; tags are emitted
+        ways: Dict[str, array] = {}
+        # Relations are buffered as (id, tags, [(type, ref, role), ...]) and
+        # resolved once the single parse has indexed every node and way
+        relations: List[Tuple[str, Dict[str, str], List[Tuple[str, str, str]]]] = []
+
+        def flush_nodes() -> None:
+            if pending_lon:
+                node_lon.extend(map(float, pending_lon))
+                node_lat.extend(map(float, pending_lat))
+                pending_lon.clear()
+                pending_lat.clear()
+
+        def handle_node(elem: Any) -> None:
+            attrib = elem.attrib
+            n_id = attrib["id"]
+            node_index[n_id] = len(node_lon) + len(pending_lon)
+            pending_lon.append(attrib["lon"])
+            pending_lat.append(attrib["lat"])
+            if len(pending_lon) >= NODE_BATCH_SIZE:
+                flush_nodes()
+
+            # Most nodes are bare way vertices with no children at all
+            if len(elem):
+                tags = _read_tags(elem)
+                if tags:
+                    lon, lat = float(attrib["lon"]), float(attrib["lat"])
+                    tags["osm_id"] = n_id
+                    add_feature("Point", (lon, lat), tags)
+
+        def handle_way(elem: Any) -> None:
+            # Ways follow nodes in OSM files, so this only converts once
+            flush_nodes()
+            w_id = elem.attrib["id"]
+            refs = [nd.attrib["ref"] for nd in elem.iter("nd")]
+            tags = _read_tags(elem)
+            rows = _gather_rows(refs, node_index)
+            ways[w_id] = rows
+
+            if tags:
+                coords = _gather_coords(rows, node_lon, node_lat)
+                # GeoJSON Polygon: first and last node must match. A closed OSM
+                # ring repeats its first ref, so compare the id strings rather than
+                # coordinate pairs; the endpoint must also be inside the extract.
+                is_polygon = len(refs) > 2 and refs[0] == refs[-1] and refs[0] in node_index
+                tags["osm_id"] = w_id
+                if is_polygon:
+                    add_feature("Polygon", [coords], tags)
+                else:
+                    add_feature("LineString", coords, tags)
+
+        def handle_relation(elem: Any) -> None:
+            tags = _read_tags(elem)
+            if tags.get("type") not in RELATION_TYPES:
+                return
+            # Copy the member attributes out: clearing elem invalidates them
+            members = [
+                (attrib["type"], attrib["ref"], attrib["role"])
+                for attrib in (m.attrib for m in elem.iter("member"))
+            ]
+            relations.append((elem.attrib["id"], tags, members))
+
+        def resolve_relation(r_id: str, tags: Dict[str, str], members: List[Tuple[str, str, str]]) -> None:
+            rel_type = tags["type"]
+
+            if rel_type in ["multipolygon", "boundary"]:
+                # Bin members by role in a single pass with one lookup per ref
+                outer: List[List[Coord]] = []
+                inner: List[List[Coord]] = []
+                for _, ref, role in members:
+                    if role == "outer":
+                        rows = ways.get(ref)
+                        if rows is not None:
+                            outer.append(_gather_coords(rows, node_lon, node_lat))
+                    elif role == "inner":
+                        rows = ways.get(ref)
+                        if rows is not None:
+                            inner.append(_gather_coords(rows, node_lon, node_lat))
+                if outer:
+                    tags["osm_id"] = r_id
+                    add_feature("MultiPolygon", [outer + inner], tags)
+
+            elif rel_type in ["route", "restriction"]:
+                # The writer serialises each feature immediately, so one
+                # properties dict is updated per member instead of copied
+                for member_type, ref, role in members:
+                    tags["rel_role"] = role
+                    tags["osm_id"] = r_id
+                    if member_type == "node":
+                        i = node_index.get(ref)
+                        if i is not None:
+                            add_feature("Point", (node_lon[i], node_lat[i]), tags)
+                    elif member_type == "way":
+                        rows = ways.get(ref)
+                        if rows is not None:
+                            add_feature("LineString", _gather_coords(rows, node_lon, node_lat), tags)
+
+        # One hash lookup per primary element instead of an if/elif chain
+        get_handler = {
+            "node": handle_node,
+            "way": handle_way,
+            "relation": handle_relation,
+        }.get
+
+        with writer:
+            # The file is parsed once. Nodes and ways are indexed and emitted as
+            # they stream past; relations (a tiny share of the bytes) are held
+            # back and resolved against the completed index, so they do not
+            # depend on appearing after their members.
+            for elem in _iter_primary(input_path):
+                handler = get_handler(elem.tag)
+                if handler is not None:
+                    handler(elem)
+            flush_nodes()
+
+            for r_id, tags, members in relations:
+                resolve_relation(r_id, tags, members)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({"type": "FeatureCollection", "features": features}, f, indent=2)
-            
         end_time = time.time()
         print(f"Conversion completed in {end_time - start_time:.4f} seconds.")
 
@@ -1,5 +1,8 @@
 from .base import DataDownloader
-from typing import Optional, Dict
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List
 
 class SpatialDownloader(DataDownloader):
     """
@@ -8,16 +11,50 @@ class SpatialDownloader(DataDownloader):
     def __init__(self, dataset_name: str):
         super().__init__(dataset_name)
         self.bbox: Optional[Dict[str, float]] = None
+        self.force_bbox: bool = False
 
-    def set_bbox(self, south: float, west: float, north: float, east: float) -> None:
-        """Sets the geographic extent (Decimal Degrees)."""
+    def set_bbox(self, south: float, west: float, north: float, east: float, force: bool = False) -> None:
+        """
+        Sets the geographic extent (Decimal Degrees).
+
+        Engines may refuse extents larger than their service accepts;
+        pass force=True to skip that pre-flight size check. Extents must have
+        south < north and west < east (antimeridian crossings are not supported).
+        """
+        if south >= north or west >= east:
+            raise ValueError(
+                f"Invalid BBOX: expected south < north and west < east, got "
+                f"south={south}, west={west}, north={north}, east={east}."
+            )
         self.bbox = {
             'south': south,
             'west': west,
             'north': north,
             'east': east
         }
+        self.force_bbox = force
 
     def download(self) -> str:
         """Abstract method to be implemented by specific API strategies."""
-        raise NotImplementedError("Subclasses must implement download()")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement download()")
+
+    def download_many(self, bboxes: List[Dict[str, float]], max_workers: int = 2) -> List[str]:
+        """
+        Downloads several extents concurrently, one file per bbox.
+
+        Downloads are I/O-bound, so a small thread pool overlaps server latency.
+        Each bbox uses the same keys as set_bbox() and is saved as
+        "<dataset_name>_<index>". Paths are returned in input order. Public
+        endpoints such as Overpass throttle aggressively, so keep max_workers low.
+        """
+        # Create the directory up front so workers do not race to create it
+        os.makedirs(self.target_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._download_one, range(len(bboxes)), bboxes))
+
+    def _download_one(self, index: int, bbox: Dict[str, float]) -> str:
+        """Runs download() for one bbox on a shallow copy so workers share no state."""
+        worker = copy.copy(self)
+        worker.dataset_name = f"{self.dataset_name}_{index}"
+        worker.set_bbox(**bbox, force=self.force_bbox)
+        return worker.download()
\ No newline at end of file
@@ -0,0 +1,57 @@
+import unittest
+import io
+import json
+from unittest.mock import patch, MagicMock
+
+from st_downloader.engines import earthexplorer
+from st_downloader.engines.earthexplorer import EarthExplorerEngine
+
+class TestEarthExplorerEngine(unittest.TestCase):
+    """
+    Unit tests for the M2M JSON transport of EarthExplorerEngine.
+    """
+
+    def setUp(self) -> None:
+        """Set up an engine with a dummy API token."""
+        self.engine: EarthExplorerEngine = EarthExplorerEngine("landsat_ot_c2_l2", "test-token")
+        self.payload: bytes = json.dumps({"data": {"results": [{"entityId": "LC09"}]}, "errorCode": None}).encode("utf-8")
+
+    def _mock_response(self) -> MagicMock:
+        """Builds a urlopen context manager whose body is the canned payload."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = io.BytesIO(self.payload)
+        return mock_response
+
+    def _assert_post(self, mock_urlopen: MagicMock, result: dict) -> None:
+        """Checks the parsed result and the POST that produced it."""
+        self.assertEqual(result["data"]["results"][0]["entityId"], "LC09")
+        self.assertIsNone(result["errorCode"])
+
+        request_obj = mock_urlopen.call_args.args[0]
+        self.assertEqual(request_obj.full_url, EarthExplorerEngine.API_URL + "scene-search")
+        self.assertEqual(request_obj.get_method(), "POST")
+        self.assertEqual(request_obj.get_header("X-auth-token"), "test-token")
+        self.assertEqual(json.loads(request_obj.data), {"datasetName": "landsat_ot_c2_l2"})
+
+    @unittest.skipIf(earthexplorer.orjson is None, "orjson not installed")
+    @patch('urllib.request.urlopen')
+    def test_post_json_orjson(self, mock_urlopen: MagicMock) -> None:
+        """Verifies responses are parsed with orjson when it is available."""
+        mock_urlopen.return_value = self._mock_response()
+
+        result = self.engine._post_json("scene-search", {"datasetName": "landsat_ot_c2_l2"})
+
+        self._assert_post(mock_urlopen, result)
+
+    @patch.object(earthexplorer, 'orjson', None)
+    @patch('urllib.request.urlopen')
+    def test_post_json_stdlib_fallback(self, mock_urlopen: MagicMock) -> None:
+        """Verifies the stdlib json fallback parses the same response."""
+        mock_urlopen.return_value = self._mock_response()
+
+        result = self.engine._post_json("scene-search", {"datasetName": "landsat_ot_c2_l2"})
+
+        self._assert_post(mock_urlopen, result)
+
+if __name__ == '__main__':
+    unittest.main()
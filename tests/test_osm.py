@@ -1,37 +1,20 @@
 import unittest
+import gzip
+import io
 import os
 import json
 import shutil
+import urllib.error
+import xml.etree.ElementTree
+from email.message import Message
 from unittest.mock import patch, MagicMock
 from typing import Dict, Any
 
+from st_downloader.engines import osm
 from st_downloader.engines.osm import OSMEngine
 
-class TestOSMEngine(unittest.TestCase):
-    """
-    Unit tests for OSMEngine using Westfield UTC (San Diego) boundaries.
-    """
-
-    def setUp(self) -> None:
-        """Set up test environment with Westfield UTC coordinates."""
-        self.dataset_name: str = "test_utc_unit"
-        self.test_dir: str = "./test_downloads"
-        self.engine: OSMEngine = OSMEngine(self.dataset_name)
-        self.engine.set_target_directory(self.test_dir)
-        # Westfield UTC BBox
-        self.engine.set_bbox(32.8680, -117.2150, 32.8750, -117.2080)
-
-    def tearDown(self) -> None:
-        """Clean up the temporary directory."""
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
-
-    def test_osm_to_geojson(self) -> None:
-        """
-        Comprehensive test for UTC features: Node, Way, Multipolygon, 
-        Boundary, Route, and Restriction.
-        """
-        osm_content: str = """<?xml version="1.0" encoding="UTF-8"?>
+# Westfield UTC extract covering Node, Way, Multipolygon, Boundary, Route and Restriction
+UTC_OSM: str = """<?xml version="1.0" encoding="UTF-8"?>
         <osm version="0.6" generator="Overpass API 0.7.62.8 e802775f">
         <note>The data included in this document is from www.openstreetmap.org. The data is made available under ODbL.</note>
         <meta osm_base="2025-12-21T23:30:31Z"/>
@@ -97,11 +80,36 @@ class TestOSMEngine(unittest.TestCase):
             <tag k="restriction" v="no_left_turn"/>
         </relation>
         </osm>"""
+
+class TestOSMEngine(unittest.TestCase):
+    """
+    Unit tests for OSMEngine using Westfield UTC (San Diego) boundaries.
+    """
+
+    def setUp(self) -> None:
+        """Set up test environment with Westfield UTC coordinates."""
+        self.dataset_name: str = "test_utc_unit"
+        self.test_dir: str = "./test_downloads"
+        self.engine: OSMEngine = OSMEngine(self.dataset_name)
+        self.engine.set_target_directory(self.test_dir)
+        # Westfield UTC BBox
+        self.engine.set_bbox(32.8680, -117.2150, 32.8750, -117.2080)
+
+    def tearDown(self) -> None:
+        """Clean up the temporary directory."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_osm_to_geojson(self) -> None:
+        """
+        Comprehensive test for UTC features: Node, Way, Multipolygon, 
+        Boundary, Route, and Restriction.
+        """
         input_path = os.path.join(self.test_dir, "utc_full.osm")
         output_path = os.path.join(self.test_dir, "utc_full.geojson")
         
         with open(input_path, "w", encoding="utf-8") as f:
-            f.write(osm_content)
+            f.write(UTC_OSM)
 
         self.engine.osm_to_geojson(output_path, input_path)
 
@@ -133,6 +141,73 @@ class TestOSMEngine(unittest.TestCase):
         no_left_from = next(f for f in restriction_features if f["properties"].get("rel_role") == "from")
         self.assertEqual(no_left_from["geometry"]["type"], "LineString")
 
+    def _convert(self, osm_content: str, name: str) -> list:
+        """Writes osm_content to disk, converts it and returns the feature list."""
+        input_path = os.path.join(self.test_dir, f"{name}.osm")
+        output_path = os.path.join(self.test_dir, f"{name}.geojson")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(osm_content)
+        self.engine.osm_to_geojson(output_path, input_path)
+        with open(output_path, "r", encoding="utf-8") as f:
+            return json.load(f)["features"]
+
+    def test_osm_to_geojson_stdlib_fallback(self) -> None:
+        """Verifies the xml.etree parser and json writer match the accelerated path."""
+        expected = self._convert(UTC_OSM, "utc_default")
+
+        with patch.object(osm, 'HAS_LXML', False), \
+                patch.object(osm, 'ET', xml.etree.ElementTree), \
+                patch.object(osm, 'orjson', None):
+            features = self._convert(UTC_OSM, "utc_stdlib")
+
+        self.assertEqual(len(features), 9)
+        self.assertEqual(features, expected)
+
+    def test_osm_to_geojson_node_batches(self) -> None:
+        """Verifies flushing node coordinates mid-stream keeps row indices aligned."""
+        expected = self._convert(UTC_OSM, "utc_default")
+
+        # 5 nodes in batches of 2 flush twice mid-stream and leave one pending
+        with patch.object(osm, 'NODE_BATCH_SIZE', 2):
+            features = self._convert(UTC_OSM, "utc_batched")
+
+        self.assertEqual(features, expected)
+
+    def test_osm_to_geojson_polygon_detection(self) -> None:
+        """
+        Verifies closed-way detection: a ring needs more than two refs and its
+        shared endpoint must be inside the extract to become a Polygon.
+        """
+        osm_content = """<?xml version="1.0" encoding="UTF-8"?>
+        <osm version="0.6">
+        <node id="1" lat="32.8715" lon="-117.2110"/>
+        <node id="2" lat="32.8720" lon="-117.2120"/>
+        <node id="3" lat="32.8730" lon="-117.2120"/>
+        <way id="20"><nd ref="1"/><nd ref="2"/><nd ref="3"/><nd ref="1"/><tag k="name" v="closed"/></way>
+        <way id="21"><nd ref="1"/><nd ref="1"/><tag k="name" v="degenerate"/></way>
+        <way id="22"><nd ref="99"/><nd ref="2"/><nd ref="3"/><nd ref="99"/><tag k="name" v="clipped"/></way>
+        </osm>"""
+        features = self._convert(osm_content, "polygons")
+        geometry = {f["properties"]["name"]: f["geometry"] for f in features}
+
+        self.assertEqual(geometry["closed"]["type"], "Polygon")
+        self.assertEqual(len(geometry["closed"]["coordinates"][0]), 4)
+        self.assertEqual(geometry["degenerate"]["type"], "LineString")
+        # Node 99 lies outside the extract, so the ring cannot close
+        self.assertEqual(geometry["clipped"]["type"], "LineString")
+        self.assertEqual(len(geometry["clipped"]["coordinates"]), 2)
+
+    def test_osm_to_geojson_truncated_input(self) -> None:
+        """Verifies a parse error leaves no partial GeoJSON behind."""
+        input_path = os.path.join(self.test_dir, "utc_truncated.osm")
+        output_path = os.path.join(self.test_dir, "utc_truncated.geojson")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(UTC_OSM[:UTC_OSM.index('<relation id="300"')])
+
+        with self.assertRaises(SyntaxError):
+            self.engine.osm_to_geojson(output_path, input_path)
+        self.assertFalse(os.path.exists(output_path))
+
     @patch('urllib.request.urlopen')
     def test_download_trigger(self, mock_urlopen: MagicMock) -> None:
         """Verifies the engine builds the specific Overpass map URL using built-ins."""
@@ -158,5 +233,131 @@ class TestOSMEngine(unittest.TestCase):
         self.assertIn("overpass-api.de/api/map", actual_url)
         self.assertIn("bbox=-117.215", actual_url)
 
+    @patch('urllib.request.urlopen')
+    def test_download_rejects_large_bbox(self, mock_urlopen: MagicMock) -> None:
+        """Verifies oversized extents fail before any request unless forced."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.read.side_effect = [b"<osm></osm>", b""]
+        mock_urlopen.return_value = mock_response
+
+        # Roughly all of San Diego County
+        self.engine.set_bbox(32.5, -117.6, 33.5, -116.1)
+        with self.assertRaises(ValueError):
+            self.engine.download()
+        mock_urlopen.assert_not_called()
+
+        self.engine.set_bbox(32.5, -117.6, 33.5, -116.1, force=True)
+        self.engine.download()
+        mock_urlopen.assert_called_once()
+
+    def test_set_bbox_rejects_inverted_extent(self) -> None:
+        """Verifies swapped corners cannot slip past the area check."""
+        with self.assertRaises(ValueError):
+            self.engine.set_bbox(32.8750, -117.2150, 32.8680, -117.2080)
+        with self.assertRaises(ValueError):
+            self.engine.set_bbox(32.8680, -117.2080, 32.8750, -117.2150)
+
+    @patch('urllib.request.urlopen')
+    def test_download_gzip_response(self, mock_urlopen: MagicMock) -> None:
+        """Verifies gzip transfer is requested and decompressed on the way to disk."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.headers = {'Content-Encoding': 'gzip'}
+        mock_response.read = io.BytesIO(gzip.compress(b"<osm></osm>")).read
+        mock_urlopen.return_value = mock_response
+
+        out_path = self.engine.download()
+
+        request_obj = mock_urlopen.call_args.args[0]
+        self.assertEqual(request_obj.get_header('Accept-encoding'), 'gzip')
+        with open(out_path, "rb") as f:
+            self.assertEqual(f.read(), b"<osm></osm>")
+
+    @patch('st_downloader.base.time.sleep')
+    @patch('urllib.request.urlopen')
+    def test_download_retries_on_throttle(self, mock_urlopen: MagicMock, mock_sleep: MagicMock) -> None:
+        """Verifies a 429 response is retried with backoff instead of raised."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.read.side_effect = [b"<osm></osm>", b""]
+        throttled = urllib.error.HTTPError("https://overpass-api.de/api/map", 429, "Too Many Requests", Message(), None)
+        mock_urlopen.side_effect = [throttled, mock_response]
+
+        out_path = self.engine.download()
+
+        self.assertEqual(mock_urlopen.call_count, 2)
+        mock_sleep.assert_called_once()
+        with open(out_path, "rb") as f:
+            self.assertEqual(f.read(), b"<osm></osm>")
+
+    @patch('st_downloader.base.time.sleep')
+    @patch('urllib.request.urlopen')
+    def test_download_honours_retry_after(self, mock_urlopen: MagicMock, mock_sleep: MagicMock) -> None:
+        """Verifies the server's Retry-After delay replaces the blind backoff."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.read.side_effect = [b"<osm></osm>", b""]
+        headers = Message()
+        headers['Retry-After'] = '7'
+        throttled = urllib.error.HTTPError("https://overpass-api.de/api/map", 429, "Too Many Requests", headers, None)
+        mock_urlopen.side_effect = [throttled, mock_response]
+
+        self.engine.download()
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch('st_downloader.base.time.sleep')
+    @patch('urllib.request.urlopen')
+    def test_download_caps_retry_after(self, mock_urlopen: MagicMock, mock_sleep: MagicMock) -> None:
+        """Verifies an excessive Retry-After is clamped to MAX_RETRY_DELAY."""
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.read.side_effect = [b"<osm></osm>", b""]
+        headers = Message()
+        headers['Retry-After'] = '86400'
+        throttled = urllib.error.HTTPError("https://overpass-api.de/api/map", 429, "Too Many Requests", headers, None)
+        mock_urlopen.side_effect = [throttled, mock_response]
+
+        self.engine.download()
+
+        mock_sleep.assert_called_once_with(OSMEngine.MAX_RETRY_DELAY)
+
+    @patch('urllib.request.urlopen')
+    def test_download_does_not_retry_client_errors(self, mock_urlopen: MagicMock) -> None:
+        """Verifies non-transient HTTP errors are raised immediately."""
+        mock_urlopen.side_effect = urllib.error.HTTPError("https://overpass-api.de/api/map", 400, "Bad Request", Message(), None)
+
+        with self.assertRaises(urllib.error.HTTPError):
+            self.engine.download()
+        self.assertEqual(mock_urlopen.call_count, 1)
+
+    @patch('urllib.request.urlopen')
+    def test_download_many(self, mock_urlopen: MagicMock) -> None:
+        """Verifies each bbox is fetched to its own file, in input order."""
+        def fake_urlopen(req: Any) -> MagicMock:
+            response = MagicMock()
+            response.__enter__.return_value = response
+            response.read.side_effect = [b"<osm></osm>", b""]
+            return response
+        mock_urlopen.side_effect = fake_urlopen
+
+        bboxes = [
+            {'south': 32.8680, 'west': -117.2150, 'north': 32.8750, 'east': -117.2080},
+            {'south': 32.8750, 'west': -117.2080, 'north': 32.8820, 'east': -117.2010},
+        ]
+        paths = self.engine.download_many(bboxes, max_workers=2)
+
+        self.assertEqual(paths, [
+            os.path.join(self.test_dir, f"{self.dataset_name}_0.osm"),
+            os.path.join(self.test_dir, f"{self.dataset_name}_1.osm"),
+        ])
+        urls = [call.args[0].full_url for call in mock_urlopen.call_args_list]
+        self.assertEqual(len(urls), 2)
+        self.assertTrue(any("bbox=-117.208,32.875" in url for url in urls))
+        # The engine's own bbox is left untouched
+        assert self.engine.bbox is not None
+        self.assertEqual(self.engine.bbox['west'], -117.2150)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file